@@ -8,6 +8,11 @@ from pathlib import Path
 from typing import Dict, Any
 import json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Fallback para json padrão se orjson não estiver instalado
+
 
 class DatabaseConfig:
     """Configurações de banco de dados flexíveis"""
@@ -51,23 +56,28 @@ class DatabaseConfig:
     def __init__(self, db_type: str = 'sqlite', custom_config: Dict[str, Any] = None):
         self.db_type = db_type
         self.config = self.DATABASE_CONFIGS.get(db_type, self.DATABASE_CONFIGS['sqlite']).copy()
-        
+        self._engine_url = None
+
         if custom_config:
             self.config.update(custom_config)
-    
+
     def get_engine_url(self) -> str:
-        """Retorna a URL de conexão do banco de dados"""
-        if self.db_type == 'sqlite':
-            # Garante que o diretório existe para SQLite
-            db_path = Path(self.config['path'])
-            db_path.parent.mkdir(parents=True, exist_ok=True)
-            return self.config['engine_template'].format(path=db_path.absolute())
-        else:
-            return self.config['engine_template'].format(**self.config)
-    
+        """Retorna a URL de conexão do banco de dados (resultado em cache)"""
+        if self._engine_url is None:
+            if self.db_type == 'sqlite':
+                # Garante que o diretório existe para SQLite
+                db_path = Path(self.config['path'])
+                db_path.parent.mkdir(parents=True, exist_ok=True)
+                self._engine_url = self.config['engine_template'].format(path=db_path.absolute())
+            else:
+                self._engine_url = self.config['engine_template'].format(**self.config)
+
+        return self._engine_url
+
     def update_config(self, **kwargs):
         """Atualiza configurações específicas"""
         self.config.update(kwargs)
+        self._engine_url = None  # Invalidar URL em cache
 
 
 class AppConfig:
@@ -84,7 +94,7 @@ class AppConfig:
         # Configurações de upload
         self.UPLOAD_FOLDER = self.PROJECT_ROOT / "uploads"
         self.MAX_FILE_SIZE = 150 * 1024 * 1024  # 150MB
-        self.ALLOWED_EXTENSIONS = {'.csv', '.xlsx', '.xls'}
+        self.ALLOWED_EXTENSIONS = frozenset({'.csv', '.xlsx', '.xls'})
         
         # Nomes das tabelas no Data Warehouse
         self.TABLE_CONTAS = "Contas"
@@ -104,14 +114,17 @@ class AppConfig:
     
     def _create_directories(self):
         """Cria os diretórios necessários se não existirem"""
-        directories = [
+        directories = (
             self.OUTPUT_PATH,
             self.UPLOAD_FOLDER,
             self.DATA_SAMPLES_PATH
-        ]
-        
+        )
+
         for directory in directories:
-            directory.mkdir(parents=True, exist_ok=True)
+            # Evita syscalls de criação quando o diretório já existe
+            # (o caso comum em toda inicialização após a primeira)
+            if not directory.is_dir():
+                os.makedirs(directory, exist_ok=True)
     
     def set_database_config(self, db_type: str, **kwargs):
         """Configura o tipo de banco de dados"""
@@ -125,9 +138,12 @@ class AppConfig:
         """Carrega configurações de um arquivo JSON"""
         config_path = Path(config_file)
         if config_path.exists():
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config_data = json.load(f)
-                
+            if orjson is not None:
+                config_data = orjson.loads(config_path.read_bytes())
+            else:
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    config_data = json.load(f)
+
             # Atualizar configurações de banco se especificadas
             if 'database' in config_data:
                 db_config = config_data['database']
@@ -152,10 +168,35 @@ class AppConfig:
             'max_file_size': self.MAX_FILE_SIZE
         }
         
-        with open(config_file, 'w', encoding='utf-8') as f:
-            json.dump(config_data, f, indent=2, ensure_ascii=False)
+        # Serialização compacta: o arquivo é lido apenas por load_from_file,
+        # então a identação só aumentaria o custo de escrita
+        if orjson is not None:
+            with open(config_file, 'wb') as f:
+                f.write(orjson.dumps(config_data))
+        else:
+            with open(config_file, 'w', encoding='utf-8') as f:
+                json.dump(config_data, f)
+
+
+class _LazyAppConfig:
+    """Proxy que adia a criação do AppConfig até o primeiro acesso
+
+    Evita tocar o sistema de arquivos (criação de diretórios) no momento
+    do `import backend`, o que acelera o startup de quem só precisa de
+    parte do pacote.
+    """
+
+    _instance = None
+
+    def _resolve(self) -> AppConfig:
+        if _LazyAppConfig._instance is None:
+            _LazyAppConfig._instance = AppConfig()
+        return _LazyAppConfig._instance
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
 
 
-# Instância global de configuração
-config = AppConfig()
+# Instância global de configuração (inicializada sob demanda)
+config = _LazyAppConfig()
 
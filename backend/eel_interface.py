@@ -3,17 +3,26 @@ Interface Eel para comunicação entre Frontend e Backend
 Expõe funções Python para o frontend via Eel.
 """
 
+import atexit
 import eel
 import os
 import shutil
+import time
 from pathlib import Path
 from typing import Dict, Any
 import tempfile
 import traceback
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from .config import config
 from .logger import etl_logger, log_info, log_error, log_success, log_warning
-from .etl_pipeline import etl_pipeline
+
+# O pipeline (e com ele pandas/sqlalchemy) é importado sob demanda dentro
+# das funções que o utilizam, para não atrasar o startup da interface
 
 
 class EelInterface:
@@ -35,6 +44,25 @@ class EelInterface:
             log_info("Diretório temporário removido")
 
 
+class _OrjsonAdapter:
+    """Adaptador que expõe orjson com a interface do módulo json usado pelo Eel"""
+
+    @staticmethod
+    def dumps(obj, *args, **kwargs):
+        return orjson.dumps(obj, default=str).decode('utf-8')
+
+    @staticmethod
+    def loads(data, *args, **kwargs):
+        return orjson.loads(data)
+
+
+def _setup_json_serializer():
+    """Substitui o serializador JSON interno do Eel por orjson (se disponível)"""
+    if orjson is not None and hasattr(eel, 'jsn'):
+        eel.jsn = _OrjsonAdapter
+        log_info("Serialização de payloads Eel usando orjson")
+
+
 # Instância global da interface
 eel_interface = EelInterface()
 
@@ -51,8 +79,10 @@ def start_etl_process(saldos_filename: str, resgates_filename: str) -> Dict[str,
         log_info(f"Arquivo de resgates: {resgates_filename}")
         
         # Verificar se os arquivos existem no diretório de uploads
-        saldos_path = config.UPLOAD_FOLDER / saldos_filename
-        resgates_path = config.UPLOAD_FOLDER / resgates_filename
+        # (resolver o diretório uma única vez)
+        upload_folder = config.UPLOAD_FOLDER
+        saldos_path = upload_folder / saldos_filename
+        resgates_path = upload_folder / resgates_filename
         
         if not saldos_path.exists():
             error_msg = f"Arquivo de saldos não encontrado: {saldos_filename}"
@@ -65,17 +95,19 @@ def start_etl_process(saldos_filename: str, resgates_filename: str) -> Dict[str,
             return {"success": False, "error": error_msg}
         
         # Executar pipeline ETL
+        from .etl_pipeline import etl_pipeline
         result = etl_pipeline.run_pipeline(str(saldos_path), str(resgates_path))
         
         return result
         
     except Exception as e:
         error_msg = f"Erro no processamento ETL: {str(e)}"
-        log_error(error_msg, traceback.format_exc())
+        tb_text = traceback.format_exc()  # Formatar o traceback uma única vez
+        log_error(error_msg, tb_text)
         return {
             "success": False,
             "error": error_msg,
-            "traceback": traceback.format_exc()
+            "traceback": tb_text
         }
 
 
@@ -88,16 +120,26 @@ def upload_file(filename: str, file_data: str) -> Dict[str, Any]:
         import base64
         
         log_info(f"Recebendo upload do arquivo: {filename}")
-        
-        # Decodificar dados do arquivo
-        file_bytes = base64.b64decode(file_data)
-        
-        # Salvar arquivo
+
+        # Decodificar e gravar em blocos para não materializar o arquivo
+        # inteiro em memória (uploads podem chegar a 150MB)
+        chunk_size = 1024 * 1024  # múltiplo de 4, exigido pelo base64
         file_path = config.UPLOAD_FOLDER / filename
-        with open(file_path, 'wb') as f:
-            f.write(file_bytes)
-        
-        file_size = len(file_bytes)
+        file_size = 0
+
+        # O_BINARY evita a tradução de novas linhas do CRT no Windows,
+        # que corromperia uploads binários (.xlsx/.xls)
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+        fd = os.open(file_path, flags)
+        try:
+            for offset in range(0, len(file_data), chunk_size):
+                decoded = base64.b64decode(file_data[offset:offset + chunk_size])
+                os.write(fd, decoded)
+                file_size += len(decoded)
+        finally:
+            os.close(fd)
+
+        _invalidate_uploads_cache()
         log_success(f"Arquivo salvo: {filename} ({file_size} bytes)")
         
         return {
@@ -119,6 +161,7 @@ def get_pipeline_status() -> Dict[str, Any]:
     Retorna o status atual do pipeline ETL
     """
     try:
+        from .etl_pipeline import etl_pipeline
         return etl_pipeline.get_pipeline_status()
     except Exception as e:
         log_error(f"Erro ao obter status do pipeline: {str(e)}")
@@ -131,6 +174,7 @@ def reset_pipeline() -> Dict[str, Any]:
     Reseta o pipeline ETL
     """
     try:
+        from .etl_pipeline import etl_pipeline
         etl_pipeline.reset_pipeline()
         return {"success": True, "message": "Pipeline resetado"}
     except Exception as e:
@@ -230,28 +274,56 @@ def get_database_stats() -> Dict[str, Any]:
         return {"success": False, "error": error_msg}
 
 
+# Cache da listagem de uploads, invalidado pelo mtime do diretório
+_uploads_cache = {"mtime": None, "files": []}
+
+
+def _invalidate_uploads_cache():
+    """Força nova leitura do diretório de uploads na próxima listagem"""
+    _uploads_cache["mtime"] = None
+
+
 @eel.expose
 def list_uploaded_files() -> Dict[str, Any]:
     """
     Lista arquivos no diretório de uploads
     """
     try:
-        files = []
         upload_folder = config.UPLOAD_FOLDER
-        
-        if upload_folder.exists():
-            for file_path in upload_folder.iterdir():
-                if file_path.is_file():
-                    stat = file_path.stat()
-                    files.append({
-                        "name": file_path.name,
-                        "size": stat.st_size,
-                        "modified": stat.st_mtime,
-                        "extension": file_path.suffix.lower()
-                    })
-        
+
+        if not upload_folder.exists():
+            return {"success": True, "files": []}
+
+        folder_mtime = upload_folder.stat().st_mtime
+        if _uploads_cache["mtime"] == folder_mtime:
+            return {"success": True, "files": _uploads_cache["files"]}
+
+        allowed_extensions = config.ALLOWED_EXTENSIONS
+        files = []
+        for file_path in upload_folder.iterdir():
+            if file_path.is_file():
+                # Extrair a extensão do nome direto, sem o parsing
+                # completo de Path.suffix
+                name = file_path.name
+                dot_index = name.rfind('.')
+                extension = name[dot_index:].lower() if dot_index > 0 else ''
+
+                if extension not in allowed_extensions:
+                    continue
+
+                stat = file_path.stat()
+                files.append({
+                    "name": name,
+                    "size": stat.st_size,
+                    "modified": stat.st_mtime,
+                    "extension": extension
+                })
+
+        _uploads_cache["mtime"] = folder_mtime
+        _uploads_cache["files"] = files
+
         return {"success": True, "files": files}
-        
+
     except Exception as e:
         error_msg = f"Erro ao listar arquivos: {str(e)}"
         log_error(error_msg)
@@ -268,6 +340,7 @@ def delete_uploaded_file(filename: str) -> Dict[str, Any]:
         
         if file_path.exists():
             file_path.unlink()
+            _invalidate_uploads_cache()
             log_success(f"Arquivo removido: {filename}")
             return {"success": True, "message": f"Arquivo {filename} removido"}
         else:
@@ -325,6 +398,7 @@ def start_eel_app():
         
         # Inicializar Eel
         eel.init(frontend_path)
+        _setup_json_serializer()
         
         # Configurações da janela/servidor
         eel_options = {
@@ -348,10 +422,28 @@ def start_eel_app():
 def cleanup_on_exit(route, websockets):
     """
     Função chamada quando a aplicação é fechada
+
+    Quando o último websocket é fechado, encerra o processo com os._exit,
+    evitando o teardown lento do interpretador. A limpeza do diretório
+    temporário está garantida pelo handler atexit e é executada
+    explicitamente aqui antes da saída.
     """
-    log_info("Encerrando aplicação...")
-    eel_interface.cleanup_temp_directory()
-    log_info("Aplicação encerrada")
+    if not websockets:
+        # Um refresh do navegador fecha o socket antigo antes de abrir o
+        # novo; aguardar como o handler padrão do Eel e reconferir evita
+        # derrubar a aplicação durante uma reconexão
+        time.sleep(1.0)
+        if eel._websockets:
+            return
+
+        log_info("Encerrando aplicação...")
+        eel_interface.cleanup_temp_directory()
+        os._exit(0)
+
+
+# Garante a remoção do diretório temporário também em saídas normais
+# do interpretador (Ctrl-C, sys.exit), não só pelo callback do Eel
+atexit.register(eel_interface.cleanup_temp_directory)
 
 
 if __name__ == "__main__":
@@ -3,9 +3,12 @@ Módulo Principal do Pipeline ETL
 Orquestra a execução do pipeline ETL completo.
 """
 
+import eel
 import pandas as pd
 from pathlib import Path
 from typing import Dict, List, Tuple, Any
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import traceback
 
 from .config import config
@@ -30,11 +33,36 @@ class ETLPipeline:
         self.progress = 0
         self.total_steps = 7
         self.results = {}
+
+        # Ring buffer com os últimos eventos de progresso e controle de
+        # coalescência para não emitir atualizações repetidas
+        self.progress_events = deque(maxlen=32)
+        self._last_emitted = None
+
+        # Nomes das tabelas de destino, resolvidos uma única vez
+        self.table_names = (
+            self.config.TABLE_CONTAS,
+            self.config.TABLE_SALDOS,
+            self.config.TABLE_RESGATES
+        )
     
     def update_progress(self, step: str, progress: int):
         """Atualiza o progresso do pipeline"""
         self.current_step = step
         self.progress = progress
+        self.progress_events.append((step, progress))
+
+        # Coalescer: emitir apenas quando o estado realmente mudou
+        if self._last_emitted == (step, progress):
+            return
+        self._last_emitted = (step, progress)
+
+        # Notificar a barra de progresso do frontend diretamente
+        try:
+            eel.update_progress(step, progress)
+        except Exception:
+            pass  # Eel pode não estar disponível durante testes
+
         log_info(f"Progresso: {progress}/{self.total_steps} - {step}")
     
     def validate_input_files(self, saldos_path: str, resgates_path: str) -> bool:
@@ -77,10 +105,9 @@ class ETLPipeline:
             
             # Armazenar informações sobre os dados extraídos
             self.results['extraction'] = {
-                'saldos_rows': len(saldos_df),
-                'saldos_cols': len(saldos_df.columns),
-                'resgates_rows': len(resgates_df),
-                'resgates_cols': len(resgates_df.columns)
+                f'{name}_{metric}': len(target)
+                for name, df in (('saldos', saldos_df), ('resgates', resgates_df))
+                for metric, target in (('rows', df), ('cols', df.columns))
             }
             
             log_success(f"Extração concluída - Saldos: {len(saldos_df)} linhas, Resgates: {len(resgates_df)} linhas")
@@ -93,19 +120,27 @@ class ETLPipeline:
     def transform_phase(self, saldos_df: pd.DataFrame, resgates_df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
         """Fase de transformação dos dados"""
         try:
-            self.update_progress("Transformando dados de saldos", 2)
-            saldos_transformed = self.transformer.transform_saldos(saldos_df)
-            
-            self.update_progress("Transformando dados de resgates", 3)
-            resgates_transformed = self.transformer.transform_resgates(resgates_df)
-            
+            # As transformações de saldos e resgates são independentes
+            # entre si e podem rodar em paralelo
+            self.update_progress("Transformando dados de saldos e resgates", 2)
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                saldos_future = executor.submit(self.transformer.transform_saldos, saldos_df)
+                resgates_future = executor.submit(self.transformer.transform_resgates, resgates_df)
+                saldos_transformed = saldos_future.result()
+                resgates_transformed = resgates_future.result()
+
+            self.update_progress("Transformações concluídas", 3)
+
             self.update_progress("Criando dimensão de contas", 4)
             dim_contas = self.transformer.create_dimension_contas(saldos_transformed, resgates_transformed)
             
             self.update_progress("Adicionando chaves estrangeiras", 5)
             fact_saldos = self.transformer.add_foreign_keys(saldos_transformed, dim_contas)
             fact_resgates = self.transformer.add_foreign_keys(resgates_transformed, dim_contas)
-            
+
+            # Liberar os DataFrames intermediários antes da carga
+            del saldos_transformed, resgates_transformed
+
             # Armazenar informações sobre os dados transformados
             self.results['transformation'] = {
                 'dim_contas_rows': len(dim_contas),
@@ -113,11 +148,7 @@ class ETLPipeline:
                 'fact_resgates_rows': len(fact_resgates)
             }
             
-            transformed_data = {
-                self.config.TABLE_CONTAS: dim_contas,
-                self.config.TABLE_SALDOS: fact_saldos,
-                self.config.TABLE_RESGATES: fact_resgates
-            }
+            transformed_data = dict(zip(self.table_names, (dim_contas, fact_saldos, fact_resgates)))
             
             log_success("Transformação concluída para todas as tabelas")
             return transformed_data
@@ -130,28 +161,25 @@ class ETLPipeline:
         """Fase de carga dos dados"""
         try:
             self.update_progress("Carregando dados no banco", 6)
-            
-            # Testar conexão antes de carregar
-            if not self.loader.test_connection():
-                log_error("Falha na conexão com banco de dados")
-                return False
-            
-            # Carregar dados
+
+            # A conexão já foi validada quando o loader foi criado; uma
+            # falha real aparece na própria carga, sem round-trip extra
             load_results = self.loader.load_multiple_dataframes(transformed_data)
-            
+
             # Verificar resultados
             success_count = sum(1 for success in load_results.values() if success)
             total_count = len(load_results)
-            
+
             if success_count == total_count:
                 log_success("Todos os dados foram carregados com sucesso")
-                
-                # Obter estatísticas finais
-                stats = self.loader.get_database_stats()
+
+                # Estatísticas calculadas dos DataFrames já em memória,
+                # evitando nova varredura no banco
+                table_counts = {name: len(df) for name, df in transformed_data.items()}
                 self.results['load'] = {
                     'tables_loaded': success_count,
-                    'total_records': stats.get('total_records', 0),
-                    'database_stats': stats
+                    'total_records': sum(table_counts.values()),
+                    'table_counts': table_counts
                 }
                 return True
             else:
@@ -165,8 +193,12 @@ class ETLPipeline:
     def run_pipeline(self, saldos_path: str, resgates_path: str) -> Dict[str, Any]:
         """Executa o pipeline ETL completo"""
         try:
+            # Limpar logs anteriores apenas se houver algo acumulado,
+            # evitando o round-trip eel.clear_logs em execuções limpas
+            if self.logger.logs:
+                self.logger.clear_logs()
+
             log_info("=== INICIANDO PIPELINE ETL ===")
-            self.logger.clear_logs()  # Limpar logs anteriores
             
             # Validar arquivos de entrada
             if not self.validate_input_files(saldos_path, resgates_path):
@@ -177,7 +209,11 @@ class ETLPipeline:
             
             # Fase 2: Transformação
             transformed_data = self.transform_phase(saldos_df, resgates_df)
-            
+
+            # Os DataFrames brutos não são mais necessários após a
+            # transformação; liberar antes de iniciar a carga
+            del saldos_df, resgates_df
+
             # Fase 3: Carga
             load_success = self.load_phase(transformed_data)
             
@@ -187,26 +223,27 @@ class ETLPipeline:
             # Finalização
             self.update_progress("Pipeline concluído", 7)
             log_success("=== PIPELINE ETL CONCLUÍDO COM SUCESSO ===")
+            self.logger.flush()  # Garantir que nenhum log fique pendente
             
-            # Preparar resultado final
+            # Preparar resultado final (logs já foram transmitidos ao
+            # frontend em tempo real, não precisam ser ecoados aqui)
             result = {
                 "success": True,
                 "database_path": self.config.get_database_engine_url(),
-                "results": self.results,
-                "logs": self.logger.get_logs()
+                "results": self.results
             }
             
             return result
             
         except Exception as e:
             error_msg = f"Erro no pipeline ETL: {str(e)}"
-            log_critical(error_msg, traceback.format_exc())
-            
+            tb_text = traceback.format_exc()  # Formatar o traceback uma única vez
+            log_critical(error_msg, tb_text)
+
             return {
                 "success": False,
                 "error": error_msg,
-                "traceback": traceback.format_exc(),
-                "logs": self.logger.get_logs()
+                "traceback": tb_text
             }
     
     def get_pipeline_status(self) -> Dict[str, Any]:
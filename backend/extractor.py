@@ -6,8 +6,26 @@ Funções responsáveis por ler os dados das fontes originais.
 import pandas as pd
 from pathlib import Path
 from typing import Tuple, List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
 
+try:
+    import cchardet
+except ImportError:
+    cchardet = None  # Detecção de charset vira opcional; mantém o fallback por tentativa
+
+try:
+    import pyarrow  # noqa: F401 - habilita o engine de CSV multithread do pandas
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
+
+try:
+    import python_calamine  # noqa: F401 - engine de Excel em Rust, bem mais rápido
+    _HAS_CALAMINE = True
+except ImportError:
+    _HAS_CALAMINE = False
+
 from .logger import log_info, log_error, log_success, log_warning
 
 
@@ -16,30 +34,69 @@ class DataExtractor:
     
     def __init__(self):
         self.supported_formats = ['.csv', '.xlsx', '.xls']
+        # Conjunto pré-computado para teste de pertencimento O(1)
+        self._supported_set = frozenset(self.supported_formats)
+        # Cache de get_file_info chaveado por (caminho, mtime, tamanho)
+        self._file_info_cache = {}
     
-    def validate_file(self, file_path: Path) -> bool:
-        """Valida se o arquivo existe e tem formato suportado"""
+    def validate_file(self, file_path: Path, extension: str = None) -> bool:
+        """Valida se o arquivo existe e tem formato suportado
+
+        Aceita a extensão já normalizada para evitar recomputá-la quando
+        o chamador (extract_file) já a possui.
+        """
         if not file_path.exists():
             log_error(f"Arquivo não encontrado: {file_path}")
             return False
-        
-        if file_path.suffix.lower() not in self.supported_formats:
+
+        if extension is None:
+            extension = file_path.suffix.lower()
+
+        if extension not in self._supported_set:
             log_error(f"Formato não suportado: {file_path.suffix}. Formatos aceitos: {self.supported_formats}")
             return False
-        
+
         return True
     
-    def read_csv_file(self, file_path: Path, delimiter: str = ';', encoding: str = 'utf-8') -> pd.DataFrame:
-        """Lê arquivo CSV com configurações flexíveis"""
+    def detect_encoding(self, file_path: Path) -> str:
+        """Detecta o encoding do arquivo em uma passada sobre uma amostra"""
+        if cchardet is None:
+            return None
+
+        try:
+            with open(file_path, 'rb') as f:
+                sample = f.read(256 * 1024)
+
+            result = cchardet.detect(sample)
+            if result and result.get('encoding') and result.get('confidence', 0) >= 0.7:
+                log_info(f"Encoding detectado: {result['encoding']} "
+                         f"(confiança {result['confidence']:.0%})")
+                return result['encoding']
+        except Exception:
+            pass  # Detecção é apenas um atalho; o fallback cobre falhas
+
+        return None
+
+    def read_csv_file(self, file_path: Path, delimiter: str = ';', encoding: str = 'utf-8',
+                      chunksize: int = 100_000) -> pd.DataFrame:
+        """Lê arquivo CSV com configurações flexíveis, em blocos (streaming)"""
         try:
             log_info(f"Lendo arquivo CSV: {file_path.name}")
-            
+
+            # Detectar o charset em uma passada; se houver resultado
+            # confiável, ele é tentado primeiro e evita leituras repetidas
+            detected = self.detect_encoding(file_path)
+
             # Tentar diferentes encodings se o padrão falhar
             encodings_to_try = [encoding, 'utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
-            
+            if detected:
+                encodings_to_try = [detected] + [
+                    enc for enc in encodings_to_try if enc.lower() != detected.lower()
+                ]
+
             for enc in encodings_to_try:
                 try:
-                    df = pd.read_csv(file_path, delimiter=delimiter, encoding=enc)
+                    df = self._read_csv_single(file_path, delimiter, enc, chunksize)
                     log_success(f"Arquivo CSV lido com sucesso usando encoding {enc}")
                     log_info(f"Dimensões: {df.shape[0]} linhas, {df.shape[1]} colunas")
                     return df
@@ -55,17 +112,51 @@ class DataExtractor:
         except Exception as e:
             log_error(f"Erro ao ler arquivo CSV {file_path.name}", str(e))
             raise
+
+    def _read_csv_single(self, file_path: Path, delimiter: str, encoding: str,
+                         chunksize: int) -> pd.DataFrame:
+        """Faz uma leitura de CSV com um encoding específico
+
+        Prefere o engine pyarrow (parsing multithread, sem suporte a
+        chunksize); na ausência do pyarrow ou se ele rejeitar o arquivo,
+        usa o engine padrão em blocos.
+        """
+        if _HAS_PYARROW:
+            try:
+                return pd.read_csv(file_path, delimiter=delimiter,
+                                   encoding=encoding, engine='pyarrow')
+            except UnicodeDecodeError:
+                raise
+            except (ValueError, TypeError):
+                pass  # Engine pyarrow não aceitou o arquivo/opções
+
+        # Ler em blocos evita materializar estruturas intermediárias do
+        # parser para o arquivo inteiro; memory_map entrega os bytes ao
+        # parser direto do page cache, sem cópias de buffer de leitura
+        with pd.read_csv(file_path, delimiter=delimiter, encoding=encoding,
+                         chunksize=chunksize, memory_map=True) as reader:
+            return pd.concat(reader, ignore_index=True)
     
+    def _read_excel(self, file_path: Path, **kwargs) -> pd.DataFrame:
+        """Lê Excel preferindo o engine calamine, com fallback ao padrão"""
+        if _HAS_CALAMINE:
+            try:
+                return pd.read_excel(file_path, engine='calamine', **kwargs)
+            except (ImportError, ValueError):
+                pass  # pandas antigo ou arquivo não aceito pelo calamine
+
+        return pd.read_excel(file_path, **kwargs)
+
     def read_excel_file(self, file_path: Path, sheet_name: str = None) -> pd.DataFrame:
         """Lê arquivo Excel (xlsx/xls)"""
         try:
             log_info(f"Lendo arquivo Excel: {file_path.name}")
-            
+
             if sheet_name:
-                df = pd.read_excel(file_path, sheet_name=sheet_name)
+                df = self._read_excel(file_path, sheet_name=sheet_name)
                 log_info(f"Planilha '{sheet_name}' lida")
             else:
-                df = pd.read_excel(file_path)
+                df = self._read_excel(file_path)
                 log_info("Primeira planilha lida")
             
             log_success(f"Arquivo Excel lido com sucesso")
@@ -78,11 +169,11 @@ class DataExtractor:
     
     def extract_file(self, file_path: Path, **kwargs) -> pd.DataFrame:
         """Extrai dados de um arquivo baseado na extensão"""
-        if not self.validate_file(file_path):
-            raise FileNotFoundError(f"Arquivo inválido: {file_path}")
-        
         file_extension = file_path.suffix.lower()
-        
+
+        if not self.validate_file(file_path, extension=file_extension):
+            raise FileNotFoundError(f"Arquivo inválido: {file_path}")
+
         if file_extension == '.csv':
             return self.read_csv_file(file_path, **kwargs)
         elif file_extension in ['.xlsx', '.xls']:
@@ -91,22 +182,31 @@ class DataExtractor:
             raise ValueError(f"Formato de arquivo não suportado: {file_extension}")
     
     def extract_multiple_files(self, file_paths: List[Path], **kwargs) -> Dict[str, pd.DataFrame]:
-        """Extrai dados de múltiplos arquivos"""
+        """Extrai dados de múltiplos arquivos em paralelo"""
         log_info(f"Iniciando extração de {len(file_paths)} arquivos")
-        
+
         dataframes = {}
         errors = []
-        
-        for file_path in file_paths:
-            try:
-                df = self.extract_file(file_path, **kwargs)
-                dataframes[file_path.stem] = df
-                log_success(f"Arquivo {file_path.name} extraído com sucesso")
-            except Exception as e:
-                error_msg = f"Erro ao extrair {file_path.name}: {str(e)}"
-                log_error(error_msg)
-                errors.append(error_msg)
-        
+
+        # Leituras de arquivos distintos são independentes e dominadas por
+        # I/O e parsing, então podem ser sobrepostas em threads
+        max_workers = min(4, len(file_paths)) or 1
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.extract_file, file_path, **kwargs): file_path
+                for file_path in file_paths
+            }
+
+            for future in as_completed(futures):
+                file_path = futures[future]
+                try:
+                    dataframes[file_path.stem] = future.result()
+                    log_success(f"Arquivo {file_path.name} extraído com sucesso")
+                except Exception as e:
+                    error_msg = f"Erro ao extrair {file_path.name}: {str(e)}"
+                    log_error(error_msg)
+                    errors.append(error_msg)
+
         if errors:
             log_warning(f"Extração concluída com {len(errors)} erros")
         else:
@@ -121,33 +221,48 @@ class DataExtractor:
         
         try:
             stat = file_path.stat()
+
+            # Enquanto o arquivo não mudar (mesmo mtime/tamanho), a leitura
+            # de amostra do conteúdo não precisa ser repetida
+            cache_key = (str(file_path), stat.st_mtime, stat.st_size)
+            cached_info = self._file_info_cache.get(cache_key)
+            if cached_info is not None:
+                return cached_info
+
+            extension = file_path.suffix.lower()
             info = {
                 "name": file_path.name,
                 "size": stat.st_size,
                 "size_mb": round(stat.st_size / (1024 * 1024), 2),
                 "modified": stat.st_mtime,
-                "extension": file_path.suffix.lower(),
-                "supported": file_path.suffix.lower() in self.supported_formats
+                "extension": extension,
+                "supported": extension in self._supported_set
             }
             
             # Tentar obter informações básicas do conteúdo
             if info["supported"]:
                 try:
-                    if file_path.suffix.lower() == '.csv':
-                        # Ler apenas as primeiras linhas para obter info
-                        sample_df = pd.read_csv(file_path, nrows=5, delimiter=';')
+                    # Ler só as 3 linhas exibidas, como texto puro:
+                    # dtype=str pula a inferência de tipos do parser,
+                    # desnecessária para uma prévia
+                    if extension == '.csv':
+                        sample_df = pd.read_csv(file_path, nrows=3, delimiter=';', dtype=str)
                         info["columns"] = list(sample_df.columns)
-                        info["sample_data"] = sample_df.head(3).to_dict('records')
-                    elif file_path.suffix.lower() in ['.xlsx', '.xls']:
-                        sample_df = pd.read_excel(file_path, nrows=5)
+                        info["sample_data"] = sample_df.to_dict('records')
+                    elif extension in ('.xlsx', '.xls'):
+                        sample_df = pd.read_excel(file_path, nrows=3, dtype=str)
                         info["columns"] = list(sample_df.columns)
-                        info["sample_data"] = sample_df.head(3).to_dict('records')
+                        info["sample_data"] = sample_df.to_dict('records')
                 except:
                     info["columns"] = []
                     info["sample_data"] = []
-            
+
+            if len(self._file_info_cache) > 128:
+                self._file_info_cache.clear()
+            self._file_info_cache[cache_key] = info
+
             return info
-            
+
         except Exception as e:
             return {"error": str(e)}
 
@@ -5,20 +5,74 @@ Funções para carregar os dados transformados no Data Warehouse.
 
 import pandas as pd
 import sqlalchemy
+import threading
 from sqlalchemy import create_engine, text, inspect
 from typing import Dict, List, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 from .config import config
 from .logger import log_info, log_error, log_success, log_warning, log_debug
 
 
+# Engines compartilhados no nível do módulo, chaveados pela URL de
+# conexão. Engines (e seus pools) são thread-safe, então um único engine
+# por banco atende todos os DataLoaders e threads do processo.
+_engines: Dict[str, sqlalchemy.engine.Engine] = {}
+_engines_lock = threading.Lock()
+
+
+def _get_engine(engine_url: str) -> sqlalchemy.engine.Engine:
+    """Retorna o engine compartilhado para a URL, criando-o se necessário"""
+    engine = _engines.get(engine_url)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(engine_url)
+            if engine is None:
+                engine_kwargs = {}
+                if engine_url.startswith('mssql+pyodbc'):
+                    # Agrupa os INSERTs do pyodbc em lotes no nível do driver
+                    engine_kwargs['fast_executemany'] = True
+                engine = create_engine(engine_url, **engine_kwargs)
+                _engines[engine_url] = engine
+
+    return engine
+
+
+def _psql_insert_copy(table, conn, keys, data_iter):
+    """Insere dados via COPY FROM STDIN (PostgreSQL)
+
+    Método para DataFrame.to_sql: envia os registros em um único comando
+    COPY em formato CSV, ordens de grandeza mais rápido que INSERTs.
+    """
+    import csv
+    import io
+
+    dbapi_conn = conn.connection
+    with dbapi_conn.cursor() as cur:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows(data_iter)
+        buffer.seek(0)
+
+        columns = ', '.join(f'"{key}"' for key in keys)
+        if table.schema:
+            table_name = f'"{table.schema}"."{table.name}"'
+        else:
+            table_name = f'"{table.name}"'
+
+        cur.copy_expert(f'COPY {table_name} ({columns}) FROM STDIN WITH CSV', buffer)
+
+
 class DataLoader:
     """Classe responsável pela carga de dados no banco"""
     
     def __init__(self, database_config=None):
         self.database_config = database_config or config.database
         self.engine = None
+        # Statements text() reutilizados por (template, tabela); o
+        # SQLAlchemy então reaproveita a compilação no cache do engine
+        self._stmt_cache = {}
         self._connect()
     
     def _connect(self):
@@ -28,8 +82,8 @@ class DataLoader:
             log_info(f"Conectando ao banco: {self.database_config.db_type}")
             log_debug(f"URL de conexão: {engine_url.split('@')[0]}@***")  # Ocultar credenciais
             
-            self.engine = create_engine(engine_url)
-            
+            self.engine = _get_engine(engine_url)
+
             # Testar conexão
             with self.engine.connect() as conn:
                 conn.execute(text("SELECT 1"))
@@ -51,20 +105,65 @@ class DataLoader:
             log_error("Teste de conexão falhou", str(e))
             return False
     
-    def get_table_info(self, table_name: str) -> Dict[str, Any]:
-        """Retorna informações sobre uma tabela"""
+    def _table_stmt(self, template: str, table_name: str):
+        """Retorna um text() em cache para um comando sobre uma tabela
+
+        Nomes de tabela não podem ser parâmetros de bind, então são
+        validados como identificadores antes da interpolação.
+        """
+        key = (template, table_name)
+        stmt = self._stmt_cache.get(key)
+        if stmt is None:
+            if not table_name.isidentifier():
+                raise ValueError(f"Nome de tabela inválido: {table_name!r}")
+            stmt = self._stmt_cache[key] = text(template.format(table=table_name))
+        return stmt
+
+    def _fast_row_count(self, conn, table_name: str) -> int:
+        """Conta registros usando o atalho disponível em cada banco
+
+        No SQLite, max(rowid) é O(1) e exato para tabelas carregadas via
+        to_sql (sem deleções); no PostgreSQL, reltuples dá a estimativa
+        do planner sem varrer a tabela. Nos demais casos, COUNT(*).
+        """
+        db_type = self.database_config.db_type
+
+        if db_type == 'sqlite':
+            result = conn.execute(self._table_stmt("SELECT max(rowid) FROM {table}", table_name))
+            return result.scalar() or 0
+
+        if db_type == 'postgresql':
+            result = conn.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table"),
+                {'table': table_name}
+            )
+            estimate = result.scalar()
+            if estimate is not None and estimate >= 0:
+                return int(estimate)
+
+        result = conn.execute(self._table_stmt("SELECT COUNT(*) FROM {table}", table_name))
+        return result.scalar()
+
+    def get_table_info(self, table_name: str, conn=None) -> Dict[str, Any]:
+        """Retorna informações sobre uma tabela
+
+        Aceita uma conexão já aberta para que chamadores em loop (como
+        get_database_stats) não abram uma conexão nova por tabela.
+        """
         try:
             inspector = inspect(self.engine)
-            
+
             if not inspector.has_table(table_name):
                 return {"exists": False}
-            
+
             columns = inspector.get_columns(table_name)
-            
+
             # Contar registros
-            with self.engine.connect() as conn:
-                result = conn.execute(text(f"SELECT COUNT(*) FROM {table_name}"))
-                row_count = result.scalar()
+            if conn is not None:
+                row_count = self._fast_row_count(conn, table_name)
+            else:
+                with self.engine.connect() as own_conn:
+                    row_count = self._fast_row_count(own_conn, table_name)
             
             return {
                 "exists": True,
@@ -91,7 +190,7 @@ class DataLoader:
         """Remove uma tabela do banco"""
         try:
             with self.engine.connect() as conn:
-                conn.execute(text(f"DROP TABLE IF EXISTS {table_name}"))
+                conn.execute(self._table_stmt("DROP TABLE IF EXISTS {table}", table_name))
                 conn.commit()
             log_success(f"Tabela {table_name} removida")
             return True
@@ -99,6 +198,17 @@ class DataLoader:
             log_error(f"Erro ao remover tabela {table_name}", str(e))
             return False
     
+    def _downcast_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Reduz a largura das colunas inteiras antes da carga
+
+        Menos bytes por registro significa menos tráfego e serialização
+        no to_sql. Colunas float ficam como estão: os valores monetários
+        perderiam precisão em float32.
+        """
+        for col in df.select_dtypes(include=['int64']).columns:
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+        return df
+
     def load_dataframe(self, df: pd.DataFrame, table_name: str, if_exists: str = 'replace') -> bool:
         """Carrega um DataFrame para uma tabela"""
         try:
@@ -108,52 +218,65 @@ class DataLoader:
             if df.empty:
                 log_warning(f"DataFrame vazio para tabela {table_name}")
                 return False
-            
-            # Verificar se a tabela já existe
-            table_info = self.get_table_info(table_name)
-            if table_info.get("exists"):
-                log_info(f"Tabela {table_name} já existe com {table_info.get('row_count', 0)} registros")
-                if if_exists == 'fail':
-                    log_error(f"Tabela {table_name} já existe e if_exists='fail'")
-                    return False
-                elif if_exists == 'append':
-                    log_info(f"Adicionando dados à tabela existente {table_name}")
-                elif if_exists == 'replace':
-                    log_info(f"Substituindo tabela {table_name}")
-            
-            # Carregar dados
+
+            df = self._downcast_dataframe(df)
+
+            # Escolher a estratégia de insert em massa conforme o banco
+            to_sql_kwargs = {'if_exists': if_exists, 'index': False}
+            db_type = self.database_config.db_type
+            if db_type == 'postgresql':
+                to_sql_kwargs['method'] = _psql_insert_copy
+            elif db_type == 'mysql':
+                to_sql_kwargs['method'] = 'multi'
+                to_sql_kwargs['chunksize'] = 1000
+            # sqlite/sqlserver: executemany padrão (no SQL Server acelerado
+            # pelo fast_executemany configurado no engine)
+
+            # Carregar dados direto: o to_sql já honra if_exists
+            # ('fail' levanta exceção), sem consultar a tabela antes
+            # nem recontar registros depois
             with self.engine.connect() as conn:
-                df.to_sql(table_name, conn, if_exists=if_exists, index=False)
+                df.to_sql(table_name, conn, **to_sql_kwargs)
                 conn.commit()
-            
-            # Verificar resultado
-            final_info = self.get_table_info(table_name)
-            final_count = final_info.get('row_count', 0)
-            
-            log_success(f"Tabela '{table_name}' carregada com {final_count} registros")
+
+            log_success(f"Tabela '{table_name}' carregada com {len(df)} registros")
             return True
             
         except Exception as e:
             log_error(f"Erro ao carregar tabela {table_name}", str(e))
             return False
     
+    def _load_one(self, df: pd.DataFrame, table_name: str, if_exists: str) -> bool:
+        """Carrega uma tabela capturando exceções como falha"""
+        try:
+            return self.load_dataframe(df, table_name, if_exists)
+        except Exception as e:
+            log_error(f"Erro ao carregar {table_name}", str(e))
+            return False
+
     def load_multiple_dataframes(self, dataframes: Dict[str, pd.DataFrame], if_exists: str = 'replace') -> Dict[str, bool]:
-        """Carrega múltiplos DataFrames"""
+        """Carrega múltiplos DataFrames, em paralelo quando o banco permite"""
         log_info(f"Iniciando carga de {len(dataframes)} tabelas...")
-        
+
         results = {}
-        success_count = 0
-        
-        for table_name, df in dataframes.items():
-            try:
-                success = self.load_dataframe(df, table_name, if_exists)
-                results[table_name] = success
-                if success:
-                    success_count += 1
-            except Exception as e:
-                log_error(f"Erro ao carregar {table_name}", str(e))
-                results[table_name] = False
-        
+
+        # SQLite serializa escritas em um único arquivo; escrever em
+        # paralelo só geraria contenção de lock. Demais bancos aceitam
+        # inserts concorrentes em tabelas distintas.
+        if self.database_config.db_type == 'sqlite' or len(dataframes) <= 1:
+            for table_name, df in dataframes.items():
+                results[table_name] = self._load_one(df, table_name, if_exists)
+        else:
+            with ThreadPoolExecutor(max_workers=min(4, len(dataframes))) as executor:
+                futures = {
+                    executor.submit(self._load_one, df, table_name, if_exists): table_name
+                    for table_name, df in dataframes.items()
+                }
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+
+        success_count = sum(1 for success in results.values() if success)
+
         if success_count == len(dataframes):
             log_success("Todas as tabelas foram carregadas com sucesso")
         else:
@@ -213,16 +336,18 @@ class DataLoader:
             
             tables = self.list_tables()
             stats["total_tables"] = len(tables)
-            
-            for table in tables:
-                table_info = self.get_table_info(table)
-                if table_info.get("exists"):
-                    row_count = table_info.get("row_count", 0)
-                    stats["tables"][table] = {
-                        "rows": row_count,
-                        "columns": len(table_info.get("columns", []))
-                    }
-                    stats["total_records"] += row_count
+
+            # Uma única conexão para todas as contagens
+            with self.engine.connect() as conn:
+                for table in tables:
+                    table_info = self.get_table_info(table, conn=conn)
+                    if table_info.get("exists"):
+                        row_count = table_info.get("row_count", 0)
+                        stats["tables"][table] = {
+                            "rows": row_count,
+                            "columns": len(table_info.get("columns", []))
+                        }
+                        stats["total_records"] += row_count
             
             return stats
             
@@ -5,6 +5,9 @@ Sistema de logging com suporte a cores e comunicação com frontend via Eel.
 
 import logging
 import sys
+import threading
+import time
+from collections import deque
 from datetime import datetime
 from typing import List, Dict, Any
 from enum import Enum
@@ -24,10 +27,37 @@ class LogLevel(Enum):
 class ETLLogger:
     """Logger personalizado para o sistema ETL"""
     
+    # Parâmetros do lote de envio ao frontend
+    FLUSH_BATCH_SIZE = 10
+    FLUSH_INTERVAL = 0.1  # segundos
+
+    # Limite do buffer de logs em memória; entradas mais antigas são
+    # descartadas automaticamente pelo deque
+    MAX_LOG_ENTRIES = 5000
+
     def __init__(self, name: str = "ETL_Logger"):
         self.name = name
-        self.logs: List[Dict[str, Any]] = []
+        # Logs de DEBUG são emitidos em laços quentes (por coluna/por
+        # valor); quando desabilitados, a chamada retorna sem montar nada
+        self.debug_enabled = False
+        self.logs = deque(maxlen=self.MAX_LOG_ENTRIES)
+        # Protege logs e fila de envio: as transformações rodam em threads
+        self._logs_lock = threading.Lock()
+        # Entradas aguardando envio ao frontend em lote
+        self._pending_frontend: List[Dict[str, Any]] = []
+        self._last_flush = 0.0
+        # Timestamp formatado em cache: a resolução é de 1s, então o
+        # strftime só precisa rodar quando o segundo muda
+        self._ts_cache = (0, '')
         self.setup_logger()
+
+    def _format_timestamp(self) -> str:
+        """Retorna o timestamp atual formatado, reutilizando o cache"""
+        second = int(time.time())
+        if self._ts_cache[0] != second:
+            formatted = datetime.fromtimestamp(second).strftime('%Y-%m-%d %H:%M:%S')
+            self._ts_cache = (second, formatted)
+        return self._ts_cache[1]
     
     def setup_logger(self):
         """Configura o logger básico"""
@@ -50,10 +80,20 @@ class ETLLogger:
         console_handler.setFormatter(formatter)
         
         self.logger.addHandler(console_handler)
-    
+
+        # Dispatch direto nível -> método do logger, sem cadeia de ifs
+        self._console_dispatch = {
+            LogLevel.DEBUG: self.logger.debug,
+            LogLevel.INFO: self.logger.info,
+            LogLevel.SUCCESS: lambda message: self.logger.info(f"✔ {message}"),
+            LogLevel.WARNING: self.logger.warning,
+            LogLevel.ERROR: self.logger.error,
+            LogLevel.CRITICAL: self.logger.critical,
+        }
+
     def _log_message(self, level: LogLevel, message: str, details: str = None):
         """Método interno para registrar mensagens"""
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        timestamp = self._format_timestamp()
         
         log_entry = {
             'timestamp': timestamp,
@@ -63,30 +103,30 @@ class ETLLogger:
             'details': details or ""
         }
         
-        self.logs.append(log_entry)
-        
-        # Enviar para o frontend via Eel (se disponível)
-        try:
-            eel.add_log_message(log_entry)
-        except:
-            pass  # Eel pode não estar disponível durante testes
-        
+        with self._logs_lock:
+            self.logs.append(log_entry)
+
+            # Enviar para o frontend via Eel em lotes, amortizando o
+            # custo de cada chamada pelo websocket. Avisos e erros são
+            # enviados imediatamente.
+            self._pending_frontend.append(log_entry)
+            urgent = level in (LogLevel.WARNING, LogLevel.ERROR, LogLevel.CRITICAL)
+            should_flush = (
+                urgent
+                or len(self._pending_frontend) >= self.FLUSH_BATCH_SIZE
+                or time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL
+            )
+
+        if should_flush:
+            self.flush()
+
         # Log no console também
-        if level == LogLevel.DEBUG:
-            self.logger.debug(message)
-        elif level == LogLevel.INFO:
-            self.logger.info(message)
-        elif level == LogLevel.SUCCESS:
-            self.logger.info(f"✔ {message}")
-        elif level == LogLevel.WARNING:
-            self.logger.warning(message)
-        elif level == LogLevel.ERROR:
-            self.logger.error(message)
-        elif level == LogLevel.CRITICAL:
-            self.logger.critical(message)
+        self._console_dispatch[level](message)
     
     def debug(self, message: str, details: str = None):
-        """Log de debug"""
+        """Log de debug (descartado cedo quando debug_enabled=False)"""
+        if not self.debug_enabled:
+            return
         self._log_message(LogLevel.DEBUG, message, details)
     
     def info(self, message: str, details: str = None):
@@ -109,52 +149,69 @@ class ETLLogger:
         """Log crítico"""
         self._log_message(LogLevel.CRITICAL, message, details)
     
+    def flush(self):
+        """Envia as entradas pendentes ao frontend em um único lote"""
+        with self._logs_lock:
+            if not self._pending_frontend:
+                return
+            batch, self._pending_frontend = self._pending_frontend, []
+            self._last_flush = time.monotonic()
+
+        try:
+            eel.add_log_batch(batch)
+        except:
+            pass  # Eel pode não estar disponível durante testes
+
     def clear_logs(self):
         """Limpa todos os logs"""
-        self.logs.clear()
+        with self._logs_lock:
+            self.logs.clear()
+            self._pending_frontend.clear()
         try:
             eel.clear_logs()
         except:
             pass
-    
+
     def get_logs(self) -> List[Dict[str, Any]]:
         """Retorna todos os logs"""
-        return self.logs.copy()
-    
+        self.flush()
+        with self._logs_lock:
+            return list(self.logs)
+
     def get_logs_by_level(self, level: LogLevel) -> List[Dict[str, Any]]:
         """Retorna logs filtrados por nível"""
-        return [log for log in self.logs if log['level'] == level.value[0]]
+        with self._logs_lock:
+            return [log for log in self.logs if log['level'] == level.value[0]]
     
     def export_logs(self, filepath: str):
         """Exporta logs para arquivo"""
+        with self._logs_lock:
+            snapshot = list(self.logs)
+
+        # Montar o conteúdo em memória e gravar de uma vez, em vez de
+        # várias chamadas de escrita pequenas
+        parts = []
+        for log in snapshot:
+            parts.append(f"[{log['timestamp']}] {log['level']}: {log['message']}\n")
+            if log['details']:
+                parts.append(f"    Detalhes: {log['details']}\n")
+            parts.append("\n")
+
         with open(filepath, 'w', encoding='utf-8') as f:
-            for log in self.logs:
-                f.write(f"[{log['timestamp']}] {log['level']}: {log['message']}\n")
-                if log['details']:
-                    f.write(f"    Detalhes: {log['details']}\n")
-                f.write("\n")
+            f.write(''.join(parts))
 
 
 # Instância global do logger
 etl_logger = ETLLogger()
 
 
-# Funções de conveniência para uso direto
-def log_debug(message: str, details: str = None):
-    etl_logger.debug(message, details)
-
-def log_info(message: str, details: str = None):
-    etl_logger.info(message, details)
-
-def log_success(message: str, details: str = None):
-    etl_logger.success(message, details)
-
-def log_warning(message: str, details: str = None):
-    etl_logger.warning(message, details)
-
-def log_error(message: str, details: str = None):
-    etl_logger.error(message, details)
-
-def log_critical(message: str, details: str = None):
-    etl_logger.critical(message, details)
+# Funções de conveniência para uso direto: referências diretas aos métodos
+# já ligados à instância, sem uma camada extra de chamada nem lookups
+# globais a cada log
+log_debug = etl_logger.debug
+log_info = etl_logger.info
+log_success = etl_logger.success
+log_warning = etl_logger.warning
+log_error = etl_logger.error
+log_critical = etl_logger.critical
 
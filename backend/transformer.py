@@ -3,58 +3,176 @@ Módulo de Transformação (Transform)
 Funções para limpeza, padronização e modelagem dos dados.
 """
 
+import numpy as np
 import pandas as pd
 import re
+from functools import lru_cache
 from typing import Dict, List, Any
 from datetime import datetime
 
+try:
+    import pyarrow  # noqa: F401 - habilita o dtype string[pyarrow]
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
+
 from .logger import log_info, log_error, log_success, log_warning, log_debug
 
 
+# Padrões de data nos nomes de coluna de saldo, compilados uma única
+# vez (ex: MARÇO23, MARÇO 23, MARÇO/23, MARÇO-23)
+_SALDO_DATE_PATTERNS = (
+    re.compile(r'(\w+)(\d{2})'),
+    re.compile(r'(\w+)\s+(\d{2})'),
+    re.compile(r'(\w+)/(\d{2})'),
+    re.compile(r'(\w+)-(\d{2})'),
+)
+
+# Mapeamento nome de mês -> número do mês
+_MONTH_MAP = {
+    'JAN': '01', 'JANEIRO': '01',
+    'FEV': '02', 'FEVEREIRO': '02',
+    'MAR': '03', 'MARÇO': '03', 'MARCO': '03',
+    'ABR': '04', 'ABRIL': '04',
+    'MAI': '05', 'MAIO': '05',
+    'JUN': '06', 'JUNHO': '06',
+    'JUL': '07', 'JULHO': '07',
+    'AGO': '08', 'AGOSTO': '08',
+    'SET': '09', 'SETEMBRO': '09',
+    'OUT': '10', 'OUTUBRO': '10',
+    'NOV': '11', 'NOVEMBRO': '11',
+    'DEZ': '12', 'DEZEMBRO': '12'
+}
+
+# Alternação única com os nomes de mês (mais longos primeiro, para
+# 'JANEIRO' casar antes de 'JAN'); substitui a varredura de substring
+# chave a chave sobre o mapeamento
+_MONTH_RE = re.compile('|'.join(
+    map(re.escape, sorted(_MONTH_MAP, key=len, reverse=True))
+))
+
+
+@lru_cache(maxsize=256)
+def _parse_saldo_date(col_name: str) -> str:
+    """Extrai e formata a data do nome da coluna de saldo
+
+    O cache vive no nível do módulo e a chave é só o nome da coluna,
+    então os resultados são reaproveitados entre execuções do pipeline
+    e entre instâncias de DataTransformer, sem prender nenhuma delas
+    por referência no cache.
+    """
+    log_debug(f"Parseando data da coluna: {col_name}")
+
+    col_upper = col_name.upper()
+
+    for pattern in _SALDO_DATE_PATTERNS:
+        match = pattern.search(col_upper)
+        if match:
+            month_str, year_str = match.groups()
+
+            # Buscar o mês com uma única execução de regex seguida
+            # de lookup O(1) no mapeamento
+            month_match = _MONTH_RE.search(month_str)
+            month = _MONTH_MAP[month_match.group(0)] if month_match else None
+
+            if month:
+                # Assumir que anos de 2 dígitos são 20XX
+                if len(year_str) == 2:
+                    year = f"20{year_str}"
+                else:
+                    year = year_str
+
+                date_str = f"{year}-{month}-01"
+                log_debug(f"Data parseada: {col_name} -> {date_str}")
+                return date_str
+
+    log_warning(f"Não foi possível parsear a data da coluna: {col_name}")
+    return None
+
+
 class DataTransformer:
     """Classe responsável pelas transformações de dados"""
-    
+
+    # Padrões de data nos nomes de coluna de saldo, compartilhados com
+    # o helper de parse do módulo
+    SALDO_DATE_PATTERNS = _SALDO_DATE_PATTERNS
+
+    # Padrões de identificação de colunas monetárias e de data nos
+    # resgates, compilados uma única vez
+    MONETARY_COL_PATTERN = re.compile('saldo|valor|vl_|repassado|resgatado|cptl|jur|cm|total')
+    DATE_COL_PATTERN = re.compile('dt_|data|competencia')
+
+    # Tabela de tradução para normalizar 'R$ 1.234,56' -> '1234.56' em
+    # uma única passada em C por string, sem o motor de regex
+    MONEY_TRANSLATION = str.maketrans(
+        {'R': None, '$': None, ' ': None, '\t': None, '\xa0': None, '.': None, ',': '.'}
+    )
+
     def __init__(self):
-        self.month_map = {
-            'JAN': '01', 'JANEIRO': '01',
-            'FEV': '02', 'FEVEREIRO': '02',
-            'MAR': '03', 'MARÇO': '03', 'MARCO': '03',
-            'ABR': '04', 'ABRIL': '04',
-            'MAI': '05', 'MAIO': '05',
-            'JUN': '06', 'JUNHO': '06',
-            'JUL': '07', 'JULHO': '07',
-            'AGO': '08', 'AGOSTO': '08',
-            'SET': '09', 'SETEMBRO': '09',
-            'OUT': '10', 'OUTUBRO': '10',
-            'NOV': '11', 'NOVEMBRO': '11',
-            'DEZ': '12', 'DEZEMBRO': '12'
-        }
+        self.month_map = _MONTH_MAP
     
     def clean_column_names(self, df: pd.DataFrame) -> pd.DataFrame:
         """Remove espaços em branco e caracteres especiais dos nomes das colunas"""
         log_debug("Limpando nomes das colunas")
-        original_columns = df.columns.tolist()
-        df.columns = df.columns.str.strip()
-        
-        cleaned_count = sum(1 for orig, clean in zip(original_columns, df.columns) if orig != clean)
+        stripped = df.columns.str.strip()
+
+        # Caso comum: nenhum nome tinha espaços — uma comparação
+        # vetorizada do Index evita o laço de contagem
+        if stripped.equals(df.columns):
+            log_debug("Nomes das colunas já estavam limpos")
+            return df
+
+        cleaned_count = int((stripped != df.columns).sum())
+        df.columns = stripped
         if cleaned_count > 0:
             log_info(f"Limpeza de colunas: {cleaned_count} colunas foram ajustadas")
-        
+
         return df
     
+    @staticmethod
+    def _is_text_dtype(series: pd.Series) -> bool:
+        """Identifica colunas de texto limpáveis (object ou string)
+
+        O pandas 3 entrega colunas de CSV no dtype 'str' em vez de
+        object; o teste por dtype precisa cobrir os dois casos.
+        """
+        return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+    def _all_iso_date_strings(self, series: pd.Series) -> bool:
+        """Verifica se a coluna contém apenas strings no formato ISO
+
+        Colunas object podem carregar datetime.date em vez de texto (o
+        engine pyarrow de CSV produz isso); nesse caso o acessor .str
+        falha e a coluna segue para a inferência genérica.
+        """
+        if not self._is_text_dtype(series):
+            return False
+        try:
+            return bool(series.str.match(r'^\d{4}-\d{2}-\d{2}$', na=False).all())
+        except (AttributeError, TypeError):
+            return False
+
     def clean_monetary_values(self, series: pd.Series) -> pd.Series:
         """Converte uma coluna de string monetária (ex: 'R$ 1.234,56') para float"""
-        if series.dtype == 'object':
+        if self._is_text_dtype(series):
+            # Sonda de poucos valores: colunas object podem já carregar
+            # números prontos (planilhas tipadas); nesse caso a conversão
+            # direta dispensa toda a limpeza de texto
+            sample = series.dropna().head(5)
+            if len(sample) and all(isinstance(v, (int, float, np.number)) for v in sample):
+                log_debug(f"Coluna {series.name} já numérica; conversão direta")
+                return pd.to_numeric(series, errors='coerce')
+
             log_debug(f"Convertendo valores monetários da coluna: {series.name}")
-            
+
             # Contar valores não nulos antes da conversão
             non_null_before = series.notna().sum()
             
+            # O formato é fixo; a tabela de tradução remove prefixo,
+            # separadores e espaços e troca a vírgula decimal em uma
+            # única varredura por string
             cleaned_series = (
-                series.str.replace("R$", "", regex=False)
-                .str.replace(".", "", regex=False)
-                .str.replace(",", ".", regex=False)
-                .str.strip()
+                series.str.translate(self.MONEY_TRANSLATION)
                 .replace('', None)  # Substituir strings vazias por None
             )
             
@@ -72,46 +190,92 @@ class DataTransformer:
         
         return series
     
+    def clean_monetary_columns(self, df: pd.DataFrame, cols: List[str]) -> pd.DataFrame:
+        """Limpa várias colunas monetárias de uma só vez
+
+        Os valores de todas as colunas de texto são achatados em uma
+        única série, limpos em uma passada vetorizada e devolvidos como
+        colunas float64, em vez de repetir a limpeza coluna a coluna.
+        """
+        object_cols = []
+        for col in cols:
+            if not self._is_text_dtype(df[col]):
+                continue
+            # Mesma sonda de clean_monetary_values: colunas object já
+            # numéricas vão direto para to_numeric, fora do bloco de texto
+            sample = df[col].dropna().head(5)
+            if len(sample) and all(isinstance(v, (int, float, np.number)) for v in sample):
+                log_debug(f"Coluna {col} já numérica; conversão direta")
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+            else:
+                object_cols.append(col)
+
+        if not object_cols:
+            return df
+
+        block = df[object_cols]
+        non_null_before = int(block.notna().to_numpy().sum())
+
+        flat = pd.Series(block.to_numpy(dtype=object).ravel())
+        cleaned = (
+            flat.str.translate(self.MONEY_TRANSLATION)
+            .replace('', None)
+        )
+        numeric = pd.to_numeric(cleaned, errors='coerce').to_numpy()
+
+        non_null_after = int(np.count_nonzero(~np.isnan(numeric)))
+        if non_null_before != non_null_after:
+            lost_values = non_null_before - non_null_after
+            log_warning(f"Conversão monetária: {lost_values} valores não puderam ser convertidos")
+
+        # Devolver cada coluna como float64 de fato: a escrita em bloco
+        # via .loc preservaria o dtype de texto original, deixando os
+        # floats encaixotados e sujeitos a virar categoria/string no
+        # optimize_dtypes
+        reshaped = numeric.reshape(block.shape)
+        for i, col in enumerate(object_cols):
+            df[col] = reshaped[:, i]
+        return df
+
     def parse_saldo_date(self, col_name: str) -> str:
-        """Extrai e formata a data do nome da coluna de saldo (ex: 'Saldo MARÇO23')"""
-        log_debug(f"Parseando data da coluna: {col_name}")
-        
-        # Padrões mais flexíveis para capturar datas
-        patterns = [
-            r'(\w+)(\d{2})',  # MARÇO23
-            r'(\w+)\s+(\d{2})',  # MARÇO 23
-            r'(\w+)/(\d{2})',  # MARÇO/23
-            r'(\w+)-(\d{2})',  # MARÇO-23
-        ]
-        
-        col_upper = col_name.upper()
-        
-        for pattern in patterns:
-            match = re.search(pattern, col_upper)
-            if match:
-                month_str, year_str = match.groups()
-                
-                # Buscar o mês no mapeamento
-                month = None
-                for key, value in self.month_map.items():
-                    if key in month_str:
-                        month = value
-                        break
-                
-                if month:
-                    # Assumir que anos de 2 dígitos são 20XX
-                    if len(year_str) == 2:
-                        year = f"20{year_str}"
-                    else:
-                        year = year_str
-                    
-                    date_str = f"{year}-{month}-01"
-                    log_debug(f"Data parseada: {col_name} -> {date_str}")
-                    return date_str
-        
-        log_warning(f"Não foi possível parsear a data da coluna: {col_name}")
-        return None
+        """Extrai e formata a data do nome da coluna de saldo (ex: 'Saldo MARÇO23')
+
+        Os mesmos nomes de coluna se repetem entre execuções do
+        pipeline; o trabalho fica no helper de módulo com cache,
+        chaveado apenas pelo nome da coluna.
+        """
+        return _parse_saldo_date(col_name)
     
+    def optimize_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Reduz o consumo de memória do DataFrame transformado
+
+        Inteiros são estreitados para a menor largura que preserva os
+        valores e colunas de texto com baixa cardinalidade (números de
+        conta/parcela, convênios) viram category, que guarda cada valor
+        distinto uma única vez. Floats monetários e datetime64 ficam
+        como estão para não perder precisão.
+        """
+        row_count = len(df)
+        if row_count == 0:
+            return df
+
+        for col in df.columns:
+            dtype = df[col].dtype
+            if pd.api.types.is_integer_dtype(dtype):
+                df[col] = pd.to_numeric(df[col], downcast='integer')
+            elif self._is_text_dtype(df[col]):
+                # Vale a pena quando os valores se repetem bastante
+                if df[col].nunique() / row_count <= 0.5:
+                    df[col] = df[col].astype('category')
+                elif _HAS_PYARROW and pd.api.types.is_object_dtype(dtype):
+                    # IDs de alta cardinalidade em colunas object
+                    # legadas: o buffer contíguo do Arrow gasta menos
+                    # memória que objetos Python e acelera groupby/merge;
+                    # o dtype str do pandas 3 já não encaixota o texto
+                    df[col] = df[col].astype('string[pyarrow]')
+
+        return df
+
     def transform_saldos(self, df: pd.DataFrame) -> pd.DataFrame:
         """Aplica todas as transformações na base de saldos"""
         log_info("Iniciando transformação da base de saldos...")
@@ -121,17 +285,15 @@ class DataTransformer:
             df = self.clean_column_names(df)
             log_info(f"Dados originais: {df.shape[0]} linhas, {df.shape[1]} colunas")
             
-            # Identificar colunas de identificação e valor
-            id_vars = []
-            value_vars = []
-            
-            for col in df.columns:
-                col_lower = col.lower()
-                if any(keyword in col_lower for keyword in ['conta', 'parcela']):
-                    id_vars.append(col)
-                elif any(keyword in col_lower for keyword in ['saldo', 'valor']):
-                    value_vars.append(col)
-            
+            # Identificar colunas de identificação e valor de forma
+            # vetorizada sobre os nomes em minúsculas
+            cols_lower = df.columns.str.lower()
+            id_mask = cols_lower.str.contains('conta|parcela', regex=True)
+            value_mask = ~id_mask & cols_lower.str.contains('saldo|valor', regex=True)
+
+            id_vars = df.columns[id_mask].tolist()
+            value_vars = df.columns[value_mask].tolist()
+
             log_info(f"Colunas de identificação: {id_vars}")
             log_info(f"Colunas de valor: {value_vars}")
             
@@ -143,30 +305,60 @@ class DataTransformer:
                 log_error("Nenhuma coluna de valor encontrada")
                 raise ValueError("Não foi possível identificar colunas de saldo/valor")
             
-            # Transformar de wide para long format
-            log_info("Convertendo dados para formato longo (melt)")
-            df_melted = df.melt(
-                id_vars=id_vars, 
-                value_vars=value_vars, 
-                var_name='dt_referencia', 
-                value_name='vl_saldo_final_mes'
-            )
-            
-            # Remover valores nulos
-            rows_before = len(df_melted)
-            df_melted.dropna(subset=['vl_saldo_final_mes'], inplace=True)
-            rows_after = len(df_melted)
-            
-            if rows_before != rows_after:
-                log_info(f"Removidos {rows_before - rows_after} registros com valores nulos")
-            
-            # Limpar valores monetários
-            df_melted['vl_saldo_final_mes'] = self.clean_monetary_values(df_melted['vl_saldo_final_mes'])
-            
-            # Parsear datas das colunas
+            # Fusão das etapas em uma única passada sobre value_vars:
+            # limpar os valores monetários ainda no formato wide e
+            # parsear a data de cada nome de coluna uma única vez. O
+            # stack em seguida descarta de uma vez tanto células vazias
+            # quanto valores não conversíveis.
+            df = self.clean_monetary_columns(df, value_vars)
+            date_map = {col: self.parse_saldo_date(col) for col in value_vars}
+
+            # Transformar de wide para long escrevendo direto no
+            # DataFrame de saída: os índices das células não nulas são
+            # calculados uma vez e cada coluna final é montada por
+            # indexação NumPy, sem o MultiIndex intermediário do stack
+            # nem as cópias de reset_index/rename
+            log_info("Convertendo dados para formato longo")
+            total_cells = len(df) * len(value_vars)
+
+            if id_vars:
+                # Coerção coluna a coluna: valores que escaparam da
+                # limpeza monetária viram NaN (e são descartados pelo
+                # nonzero abaixo) em vez de derrubar o cast do bloco
+                values = np.column_stack([
+                    pd.to_numeric(df[col], errors='coerce').to_numpy(dtype='float64')
+                    for col in value_vars
+                ])
+                row_idx, col_idx = np.nonzero(~np.isnan(values))
+                value_names = np.asarray(value_vars, dtype=object)
+
+                columns = {col: df[col].to_numpy()[row_idx] for col in id_vars}
+                columns['dt_referencia'] = value_names[col_idx]
+                columns['vl_saldo_final_mes'] = values[row_idx, col_idx]
+                df_melted = pd.DataFrame(columns)
+            else:
+                # Sem colunas de identificação o stack perderia o vínculo
+                # com as linhas; manter o melt nesse caso raro
+                df_melted = df.melt(
+                    value_vars=value_vars,
+                    var_name='dt_referencia',
+                    value_name='vl_saldo_final_mes'
+                )
+                df_melted = df_melted.dropna(subset=['vl_saldo_final_mes'])
+
+            dropped_rows = total_cells - len(df_melted)
+            if dropped_rows > 0:
+                log_info(f"Removidos {dropped_rows} registros com valores nulos")
+
+            # Aplicar as datas já parseadas dos nomes das colunas
             log_info("Parseando datas das colunas de referência")
-            df_melted['dt_referencia'] = df_melted['dt_referencia'].apply(self.parse_saldo_date)
-            df_melted['dt_referencia'] = pd.to_datetime(df_melted['dt_referencia'], errors='coerce')
+            df_melted['dt_referencia'] = df_melted['dt_referencia'].map(date_map)
+            # As strings já saem de parse_saldo_date normalizadas como
+            # YYYY-MM-01; o format explícito usa o caminho rápido em C
+            # do pandas em vez de inferir data a data via dateutil
+            df_melted['dt_referencia'] = pd.to_datetime(
+                df_melted['dt_referencia'], format='%Y-%m-%d', errors='coerce', cache=True
+            )
             
             # Remover registros com datas inválidas
             valid_dates = df_melted['dt_referencia'].notna()
@@ -185,9 +377,11 @@ class DataTransformer:
                     column_mapping[col] = 'nr_parcela'
             
             if column_mapping:
-                df_melted.rename(columns=column_mapping, inplace=True)
+                df_melted = df_melted.rename(columns=column_mapping)
                 log_info(f"Colunas renomeadas: {column_mapping}")
             
+            df_melted = self.optimize_dtypes(df_melted)
+
             log_success(f"Transformação de saldos concluída: {len(df_melted)} registros finais")
             return df_melted
             
@@ -204,33 +398,18 @@ class DataTransformer:
             df = self.clean_column_names(df)
             log_info(f"Dados originais: {df.shape[0]} linhas, {df.shape[1]} colunas")
             
-            # Identificar e limpar colunas monetárias
-            monetary_patterns = [
-                'saldo', 'valor', 'vl_', 'repassado', 'resgatado', 
-                'cptl', 'jur', 'cm', 'total'
-            ]
-            
-            monetary_cols = []
-            for col in df.columns:
-                col_lower = col.lower()
-                if any(pattern in col_lower for pattern in monetary_patterns):
-                    monetary_cols.append(col)
-            
+            # Identificar colunas monetárias e de data em uma passada
+            # vetorizada com os padrões compilados da classe
+            cols_lower = df.columns.str.lower()
+            monetary_cols = df.columns[cols_lower.str.contains(self.MONETARY_COL_PATTERN)].tolist()
+            date_cols = df.columns[cols_lower.str.contains(self.DATE_COL_PATTERN)].tolist()
+
             log_info(f"Colunas monetárias identificadas: {monetary_cols}")
-            
-            for col in monetary_cols:
-                if col in df.columns:
-                    df[col] = self.clean_monetary_values(df[col])
-            
-            # Identificar e converter colunas de data
-            date_patterns = ['dt_', 'data', 'competencia']
-            date_cols = []
-            
-            for col in df.columns:
-                col_lower = col.lower()
-                if any(pattern in col_lower for pattern in date_patterns):
-                    date_cols.append(col)
-            
+
+            # Conversão em bloco de todas as colunas monetárias
+            if monetary_cols:
+                df = self.clean_monetary_columns(df, monetary_cols)
+
             log_info(f"Colunas de data identificadas: {date_cols}")
             
             for col in date_cols:
@@ -240,6 +419,10 @@ class DataTransformer:
                     # Tentar diferentes formatos de data
                     if 'competencia' in col.lower():
                         df[col] = pd.to_datetime(df[col], format='%d/%m/%Y', errors='coerce')
+                    elif self._all_iso_date_strings(df[col]):
+                        # Coluna inteira no formato ISO: formato explícito
+                        # dispensa a inferência valor a valor
+                        df[col] = pd.to_datetime(df[col], format='%Y-%m-%d', errors='coerce')
                     else:
                         df[col] = pd.to_datetime(df[col], errors='coerce')
                     
@@ -248,43 +431,30 @@ class DataTransformer:
                     total_rows = len(df)
                     log_info(f"Coluna {col}: {valid_dates}/{total_rows} datas válidas")
             
-            # Padronizar nomes das colunas principais
-            column_mapping = {
-                'Número da Conta Judicial': 'nr_conta_judicial',
-                'Número da Parcela': 'nr_parcela',
-                'Número do Convênio de Repasse': 'cd_convenio_repasse'
-            }
-            
-            # Buscar colunas similares caso os nomes exatos não existam
-            for old_name, new_name in column_mapping.copy().items():
-                if old_name not in df.columns:
-                    # Buscar coluna similar
-                    for col in df.columns:
-                        col_lower = col.lower()
-                        old_lower = old_name.lower()
-                        
-                        if 'conta' in old_lower and 'judicial' in old_lower:
-                            if 'conta' in col_lower and 'judicial' in col_lower:
-                                column_mapping[col] = new_name
-                                del column_mapping[old_name]
-                                break
-                        elif 'parcela' in old_lower:
-                            if 'parcela' in col_lower:
-                                column_mapping[col] = new_name
-                                del column_mapping[old_name]
-                                break
-                        elif 'convenio' in old_lower:
-                            if 'convenio' in col_lower or 'repasse' in col_lower:
-                                column_mapping[col] = new_name
-                                del column_mapping[old_name]
-                                break
-            
-            # Aplicar renomeação
-            existing_mappings = {k: v for k, v in column_mapping.items() if k in df.columns}
-            if existing_mappings:
-                df.rename(columns=existing_mappings, inplace=True)
-                log_info(f"Colunas renomeadas: {existing_mappings}")
+            # Padronizar nomes das colunas principais em uma única passada
+            # sobre os nomes em minúsculas já computados: o primeiro nome
+            # que casa com as palavras-chave de cada alvo é renomeado
+            column_mapping = {}
+            assigned = set()
+            for col, col_lower in zip(df.columns, cols_lower):
+                if ('nr_conta_judicial' not in assigned
+                        and 'conta' in col_lower and 'judicial' in col_lower):
+                    column_mapping[col] = 'nr_conta_judicial'
+                    assigned.add('nr_conta_judicial')
+                elif 'nr_parcela' not in assigned and 'parcela' in col_lower:
+                    column_mapping[col] = 'nr_parcela'
+                    assigned.add('nr_parcela')
+                elif ('cd_convenio_repasse' not in assigned
+                        and ('convenio' in col_lower or 'repasse' in col_lower)):
+                    column_mapping[col] = 'cd_convenio_repasse'
+                    assigned.add('cd_convenio_repasse')
+
+            if column_mapping:
+                df = df.rename(columns=column_mapping)
+                log_info(f"Colunas renomeadas: {column_mapping}")
             
+            df = self.optimize_dtypes(df)
+
             log_success(f"Transformação de resgates concluída: {len(df)} registros")
             return df
             
@@ -301,43 +471,56 @@ class DataTransformer:
             conta_cols = ['nr_conta_judicial']
             parcela_cols = ['nr_parcela']
             convenio_cols = ['cd_convenio_repasse']
-            
-            # Extrair contas únicas dos saldos
+
             saldos_cols = [col for col in conta_cols + parcela_cols if col in saldos_df.columns]
-            if saldos_cols:
-                contas_saldos = saldos_df[saldos_cols].drop_duplicates()
-                log_info(f"Contas únicas dos saldos: {len(contas_saldos)}")
-            else:
+            resgates_cols = [col for col in conta_cols + parcela_cols + convenio_cols
+                             if col in resgates_df.columns]
+            common_cols = [col for col in conta_cols + parcela_cols
+                           if col in saldos_df.columns and col in resgates_df.columns]
+
+            if not saldos_cols:
                 log_warning("Nenhuma coluna de conta/parcela encontrada nos saldos")
-                contas_saldos = pd.DataFrame()
-            
-            # Extrair contas únicas dos resgates
-            resgates_cols = [col for col in conta_cols + parcela_cols + convenio_cols if col in resgates_df.columns]
-            if resgates_cols:
-                contas_resgates = resgates_df[resgates_cols].drop_duplicates()
-                log_info(f"Contas únicas dos resgates: {len(contas_resgates)}")
-            else:
+            if not resgates_cols:
                 log_warning("Nenhuma coluna de conta/parcela encontrada nos resgates")
-                contas_resgates = pd.DataFrame()
-            
-            # Fazer merge das contas
-            if not contas_saldos.empty and not contas_resgates.empty:
-                merge_cols = [col for col in conta_cols + parcela_cols if col in contas_saldos.columns and col in contas_resgates.columns]
-                if merge_cols:
-                    dim_contas = pd.merge(contas_saldos, contas_resgates, on=merge_cols, how='outer')
+
+            if saldos_cols and resgates_cols and common_cols:
+                # União estilo hash-set: concatenar as chaves das duas
+                # fontes e deduplicar uma única vez, em vez de deduplicar
+                # cada lado e ainda pagar um merge outer
+                key_union = pd.concat(
+                    [saldos_df[common_cols], resgates_df[common_cols]],
+                    ignore_index=True, sort=False
+                ).drop_duplicates(ignore_index=True)
+                log_info(f"Contas únicas combinadas: {len(key_union)}")
+
+                extra_cols = [col for col in resgates_cols if col not in common_cols]
+                if extra_cols:
+                    # Anexar as colunas extras dos resgates (ex: convênio)
+                    dim_contas = key_union.merge(
+                        resgates_df[resgates_cols].drop_duplicates(),
+                        on=common_cols, how='left'
+                    )
                 else:
-                    # Se não há colunas em comum, concatenar
-                    dim_contas = pd.concat([contas_saldos, contas_resgates], ignore_index=True).drop_duplicates()
-            elif not contas_saldos.empty:
-                dim_contas = contas_saldos
-            elif not contas_resgates.empty:
-                dim_contas = contas_resgates
+                    dim_contas = key_union
+            elif saldos_cols and resgates_cols:
+                # Sem colunas em comum, concatenar; sort=False evita a
+                # reordenação de colunas (e o Copy-on-Write do pandas já
+                # torna a cópia dos blocos preguiçosa)
+                dim_contas = pd.concat(
+                    [saldos_df[saldos_cols].drop_duplicates(ignore_index=True),
+                     resgates_df[resgates_cols].drop_duplicates(ignore_index=True)],
+                    ignore_index=True, sort=False
+                ).drop_duplicates(ignore_index=True)
+            elif saldos_cols:
+                dim_contas = saldos_df[saldos_cols].drop_duplicates()
+            elif resgates_cols:
+                dim_contas = resgates_df[resgates_cols].drop_duplicates()
             else:
                 log_error("Não foi possível criar dimensão de contas - nenhum dado válido encontrado")
                 raise ValueError("Dados insuficientes para criar dimensão de contas")
             
             # Adicionar ID sequencial
-            dim_contas.reset_index(drop=True, inplace=True)
+            dim_contas = dim_contas.reset_index(drop=True)
             dim_contas.insert(0, 'id_conta', range(1, len(dim_contas) + 1))
             
             log_success(f"Dimensão 'Contas' criada com {len(dim_contas)} registros únicos")
@@ -361,9 +544,21 @@ class DataTransformer:
                 return fact_df
             
             log_info(f"Adicionando chaves estrangeiras usando colunas: {join_cols}")
-            
+
+            # Alinhar as chaves de junção em um dtype categórico comum:
+            # com as mesmas categorias dos dois lados o merge compara
+            # códigos inteiros em vez de fazer hash de strings
+            dim_subset = dim_contas[join_cols + ['id_conta']].copy()
+            for col in join_cols:
+                categories = pd.Index(
+                    pd.unique(fact_df[col].dropna().astype(object))
+                ).union(pd.Index(pd.unique(dim_subset[col].dropna().astype(object))))
+                cat_dtype = pd.CategoricalDtype(categories)
+                fact_df[col] = fact_df[col].astype(cat_dtype)
+                dim_subset[col] = dim_subset[col].astype(cat_dtype)
+
             # Fazer merge para adicionar id_conta
-            result_df = pd.merge(fact_df, dim_contas[join_cols + ['id_conta']], on=join_cols, how='left')
+            result_df = pd.merge(fact_df, dim_subset, on=join_cols, how='left')
             
             # Verificar se todas as linhas receberam id_conta
             missing_ids = result_df['id_conta'].isna().sum()
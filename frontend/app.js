@@ -645,13 +645,18 @@ function add_log_message(logEntry) {
     addLogMessage(logEntry);
 }
 
+eel.expose(add_log_batch);
+function add_log_batch(logEntries) {
+    logEntries.forEach(addLogMessage);
+}
+
 eel.expose(update_progress);
-function update_progress_callback(step, progress) {
+function update_progress(step, progress) {
     updateProgress(step, progress);
 }
 
 eel.expose(clear_logs);
-function clear_logs_callback() {
+function clear_logs() {
     clearLogs();
 }
 